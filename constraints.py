@@ -0,0 +1,168 @@
+"""
+Compact constraint engine.
+Letters are numbered 0-25 and sets of letters are 26-bit masks. Sets of words are Python ints
+used as bitsets over word ids (bit i set means allWords[i] is in the set), so narrowing the
+candidates down is a handful of ANDs/ORs instead of a per-word scan.
+"""
+
+from patterns import GREEN, GREY, YELLOW
+from wordList import packedLetters
+
+def letterId(letter):
+    return ord(letter) - ord('a')
+
+
+def letterFromId(i):
+    return chr(ord('a') + i)
+
+
+def idsFromBits(bits):
+    """ Members of a bitset, in word id order. """
+    found = []
+    while bits:
+        low = bits & -bits
+        found.append(low.bit_length() - 1)
+        bits ^= low
+    return found
+
+
+def countBits(bits):
+    return bin(bits).count("1")
+
+
+# letterMarks[l]: translate table turning ASCII letters into b"1" where the letter is l and b"0" elsewhere
+letterMarks = [bytes(ord("1") if byte == ord("a") + l else ord("0") for byte in range(256)) for l in range(26)]
+
+
+class WordIndex(object):
+    """
+    A word list encoded once as inverted indexes from letters to word bitsets.
+    Built a column of letters at a time straight from the packed bytes, not a word at a time.
+    """
+
+    def __init__(self, words):
+        self.words = words
+        self.length = len(words[0]) if words else 5
+        self.packed = packedLetters(words)
+        self.all = (1 << len(words)) - 1
+
+        # atPosition[pos][letter]: words with that letter at that index
+        # withCount[letter][k]: words with exactly k copies of that letter
+        # letterHistogram[letter * 3 + k]: words with k+1 or more copies of the letter, for k < 3
+        self.atPosition = []
+        for pos in range(self.length):
+            # the letter at pos in every word, reversed so word 0 ends up as the lowest bit
+            column = self.packed[pos::self.length][::-1]
+            self.atPosition.append([int(column.translate(marks) or b"0", 2) for marks in letterMarks])
+
+        self.withCount = []
+        self.letterHistogram = [0] * 26 * 3
+        for l in range(26):
+            # atLeast[k]: words with k or more copies, added up one position at a time
+            atLeast = [self.all] + [0] * (self.length + 1)
+            for pos in range(self.length):
+                here = self.atPosition[pos][l]
+                for k in range(pos + 1, 0, -1):
+                    atLeast[k] |= atLeast[k - 1] & here
+            self.withCount.append([atLeast[k] & ~atLeast[k + 1] for k in range(self.length + 1)])
+            for k in range(min(self.length, 3)):
+                self.letterHistogram[l * 3 + k] = countBits(atLeast[k + 1])
+
+        self.letterSlots = [None] * len(words)  # filled in by slots() as words are asked for
+
+    def slots(self, i):
+        """ letterHistogram buckets word i counts towards. """
+        slots = self.letterSlots[i]
+        if slots is None:
+            word = self.packed[i * self.length:(i + 1) * self.length]
+            slots = self.letterSlots[i] = tuple((letter - ord("a")) * 3 + k for letter in set(word)
+                                                for k in range(min(word.count(letter), 3)))
+        return slots
+
+
+class Constraints(object):
+    """
+    Everything the feedback so far has told us about the answer.
+        greens: letter id known to be at each position, or -1
+        wrong: per position, mask of letters known not to be there (yellows, and greys of letters that do appear)
+        minCounts / maxCounts: bounds on how many copies of each letter the answer has
+    """
+
+    def __init__(self, length=5):
+        self.length = length
+        self.greens = [-1] * length
+        self.wrong = [0] * length
+        self.minCounts = [0] * 26
+        self.maxCounts = [length] * 26
+
+    def update(self, guess, colors):
+        """ colors: GREEN/YELLOW/GREY per position of guess. """
+        # greens and yellows both tell us the answer has at least that many copies of the letter
+        seen = {}
+        for letter, color in zip(guess, colors):
+            if color != GREY:
+                seen[letter] = seen.get(letter, 0) + 1
+
+        for idx, (letter, color) in enumerate(zip(guess, colors)):
+            l = letterId(letter)
+            if color == GREEN:
+                self.greens[idx] = l
+            elif color == YELLOW:
+                self.wrong[idx] |= 1 << l
+            else:
+                # a grey means we've seen every copy there is
+                self.maxCounts[l] = seen.get(letter, 0)
+                if seen.get(letter):
+                    self.wrong[idx] |= 1 << l
+
+        for letter, count in seen.items():
+            l = letterId(letter)
+            self.minCounts[l] = max(self.minCounts[l], count)
+
+    def filter(self, index, bits):
+        """ Narrow a bitset of word ids down to the words that fit. """
+        for pos, green in enumerate(self.greens):
+            atPosition = index.atPosition[pos]
+            if green >= 0:
+                bits &= atPosition[green]
+                continue
+            # letters missing altogether are taken care of by the counts below
+            banned = self.wrong[pos]
+            while banned and bits:
+                low = banned & -banned
+                bits &= ~atPosition[low.bit_length() - 1]
+                banned ^= low
+
+        for l in range(26):
+            low, high = self.minCounts[l], self.maxCounts[l]
+            if low == 0 and high == self.length:
+                continue
+            counts = index.withCount[l]
+            allowedCounts = 0
+            for k in range(low, high + 1):
+                allowedCounts |= counts[k]
+            bits &= allowedCounts
+        return bits
+
+    def copy(self):
+        copied = Constraints(self.length)
+        copied.greens = list(self.greens)
+        copied.wrong = list(self.wrong)
+        copied.minCounts = list(self.minCounts)
+        copied.maxCounts = list(self.maxCounts)
+        return copied
+
+    def key(self):
+        """ Hashable summary: equal keys mean identical knowledge. """
+        return (tuple(self.greens), tuple(self.wrong), tuple(self.minCounts), tuple(self.maxCounts))
+
+
+_indexes = {}
+
+
+def loadIndex(words):
+    """ One index per process per word list. """
+    index = _indexes.get(id(words))
+    if index is None:
+        index = _indexes[id(words)] = WordIndex(words)
+    return index
@@ -0,0 +1,101 @@
+"""
+Opening book: the first few turns of every game are the same for a given word list, mode
+and strategy, so work them out once and keep them as a decision tree on disk.
+
+    {"guess": "raise", "replies": {"bbybg": {"guess": "...", "replies": {...}}, ...}}
+
+Replies are keyed by the feedback colors (see patterns.colorsFromPattern).
+The cache file is named and keyed by a hash of the word list, the mode, the depth and the source of
+everything the guesses depend on (see wordle.guessLogic), so it's rebuilt automatically whenever
+any of those change.
+"""
+
+import hashlib
+import json
+import os
+from patterns import cacheDir, colorsFromPattern, listsDigest
+
+
+class OpeningBook(object):
+    def __init__(self, tree):
+        self.tree = tree
+
+    def lookup(self, history):
+        """ The book's guess after the given (guess, code) turns, or None if we've left the book. """
+        node = self.tree
+        for guess, code in history:
+            if node is None or node["guess"] != guess:
+                return None
+            node = node.get("replies", {}).get(colorsFromPattern(code, len(guess)))
+        return node and node["guess"]
+
+
+def buildTree(newGame, depth, history=()):
+    """ Replay history on a fresh game, take the live guess, then recurse into every possible reply. """
+    game = newGame()
+    for guess, code in history:
+        game.applyPattern(guess, code)
+    game.filterWords()
+    guess = game.guess()
+    node = {"guess": guess}
+    if depth <= 1 or len(game.candidates) <= 1:
+        return node
+
+    codes = set(game.patterns.pattern(guess, answer) for answer in game.candidates)
+    solved = 3 ** len(guess) - 1  # all green
+    node["replies"] = {
+        colorsFromPattern(code, len(guess)): buildTree(newGame, depth - 1, history + ((guess, code),))
+        for code in sorted(codes) if code != solved
+    }
+    return node
+
+
+def bookKey(game, logic, depth):
+    digest = hashlib.sha1(listsDigest(game.allWords, game.answers))
+    digest.update(("%s|%s|%d|" % (game.strategy.name, game.hardMode, depth)).encode())
+    digest.update(logic([game.strategy.name]).encode())
+    return digest.hexdigest()
+
+
+_books = {}
+
+
+def loadBook(newGame, logic, depth=2, memoKey=None):
+    """
+    newGame: returns a fresh GameState (no answer, no book) set up the way the book should play.
+    logic: strategy names -> source the guesses depend on (see wordle.guessLogic).
+    depth: number of turns to precompute, 1 is just the opening guess.
+    memoKey: cheap key for this process's copy (word list ids, mode, strategy, depth).
+        Only a miss pays for probing a game and hashing everything to check the file.
+    """
+    book = _books.get(memoKey) if memoKey is not None else None
+    if book is not None:
+        return book
+
+    probe = newGame()
+    key = bookKey(probe, logic, depth)
+
+    mode = "hard" if probe.hardMode else "easy"
+    # named by the key too, so books for other word lists or depths sit side by side instead of replacing each other
+    path = os.path.join(cacheDir, "book-%s-%s-%s.json" % (probe.strategy.name, mode, key[:16]))
+    tree = None
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+        if stored.get("key") == key:
+            tree = stored["tree"]
+    except (OSError, ValueError):
+        pass
+
+    if tree is None:
+        tree = buildTree(newGame, depth)
+        os.makedirs(cacheDir, exist_ok=True)
+        tmpPath = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmpPath, "w") as f:
+            json.dump({"key": key, "tree": tree}, f)
+        os.replace(tmpPath, path)
+
+    book = OpeningBook(tree)
+    if memoKey is not None:
+        _books[memoKey] = book
+    return book
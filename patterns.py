@@ -0,0 +1,158 @@
+"""
+Feedback engine.
+Every guess is scored against every answer once and the results are kept as one byte per pair
+(two for words longer than 5 letters): a base-3 code where digit i (weight 3**i) is 0 for grey,
+1 for yellow and 2 for green at index i.
+The table is written to a cache file that's checked against a hash of the word lists,
+and memory-mapped on later runs so each process only pays for the pages it touches.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+
+GREY = 0
+YELLOW = 1
+GREEN = 2
+colorCodes = {"b": GREY, "y": YELLOW, "g": GREEN}
+colorNames = "byg"
+
+cacheDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+MAGIC = b"WPAT2"
+HEADER = struct.Struct("<5s3x20sII")
+
+
+def computePattern(guess, answer):
+    """ Score a guess the way the Wordle app does: greens first, then yellows left to right while unmatched copies remain. """
+    unmatched = {}
+    for g, a in zip(guess, answer):
+        if g != a:
+            unmatched[a] = unmatched.get(a, 0) + 1
+
+    code = 0
+    place = 1
+    for g, a in zip(guess, answer):
+        if g == a:
+            code += GREEN * place
+        elif unmatched.get(g):
+            unmatched[g] -= 1
+            code += YELLOW * place
+        place *= 3
+    return code
+
+
+def patternFromColors(colors):
+    """ "gybbb" -> base-3 code. Anything other than g or y counts as grey. """
+    code = 0
+    place = 1
+    for color in colors:
+        code += colorCodes.get(color, GREY) * place
+        place *= 3
+    return code
+
+
+def colorsFromPattern(code, length=5):
+    colors = ""
+    for i in range(length):
+        colors += colorNames[code % 3]
+        code //= 3
+    return colors
+
+
+def wordsHash(*wordLists):
+    digest = hashlib.sha1()
+    for words in wordLists:
+        digest.update("\n".join(words).encode())
+        digest.update(b"\0")
+    return digest.digest()
+
+
+_digests = {}
+
+
+def listsDigest(guesses, answers=None):
+    """ wordsHash(guesses, answers), worked out once per process per pair of lists. """
+    key = (id(guesses), id(answers))
+    entry = _digests.get(key)
+    if entry is None:
+        # the lists ride along so their ids can't be reused while the digest is remembered
+        entry = _digests[key] = (wordsHash(guesses, guesses if answers is None else answers), guesses, answers)
+    return entry[0]
+
+
+class PatternTable(object):
+    def __init__(self, guesses, answers=None, path=None):
+        """
+        guesses: words we're allowed to play (rows)
+        answers: words that might be the solution (columns). Defaults to guesses.
+        path: cache file. Defaults to one named after the word list hash in cacheDir.
+        """
+        self.guesses = guesses
+        self.answers = guesses if answers is None else answers
+        self.guessIds = {word: i for i, word in enumerate(self.guesses)}
+        self.answerIds = {word: i for i, word in enumerate(self.answers)}
+        self.answerIdOfGuess = [self.answerIds.get(word, -1) for word in self.guesses]
+        self.width = len(self.answers)
+        length = len(self.answers[0]) if self.width else 5
+        self.typecode = "B" if 3 ** length <= 256 else "H"
+        self.digest = listsDigest(guesses, answers)
+        self.path = path or os.path.join(cacheDir, "patterns-%s.bin" % self.digest.hex()[:16])
+
+        self.data = self._load()
+        if self.data is None:
+            self._build()
+            self.data = self._load()
+        self.codes = memoryview(self.data)[HEADER.size:].cast(self.typecode)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(data) < HEADER.size:
+            return None
+        magic, digest, numGuesses, numAnswers = HEADER.unpack_from(data)
+        itemSize = array(self.typecode).itemsize
+        if (magic != MAGIC or digest != self.digest or numGuesses != len(self.guesses)
+                or numAnswers != self.width or len(data) != HEADER.size + numGuesses * numAnswers * itemSize):
+            data.close()
+            return None
+        return data
+
+    def _build(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # write next to the real file and swap it in, so concurrent processes never map half a table
+        tmpPath = "%s.%d.tmp" % (self.path, os.getpid())
+        with open(tmpPath, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.digest, len(self.guesses), self.width))
+            for guess in self.guesses:
+                array(self.typecode, [computePattern(guess, answer) for answer in self.answers]).tofile(f)
+        os.replace(tmpPath, self.path)
+
+    def pattern(self, guess, answer):
+        return self.codes[self.guessIds[guess] * self.width + self.answerIds[answer]]
+
+    def rowById(self, guessId):
+        """ Codes for one guess against every answer, indexed by answer id. A view, nothing is copied. """
+        start = guessId * self.width
+        return self.codes[start:start + self.width]
+
+    def row(self, guess):
+        return self.rowById(self.guessIds[guess])
+
+
+_tables = {}
+
+
+def loadTable(guesses, answers=None):
+    """ One table per process per word list, so every game in a process shares the same mapping. """
+    key = (id(guesses), id(answers))
+    table = _tables.get(key)
+    if table is None:
+        table = _tables[key] = PatternTable(guesses, answers)
+    return table
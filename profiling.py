@@ -0,0 +1,116 @@
+"""
+Timers and counters for finding out where a game spends its time.
+GameState methods wrapped in @timed record into gameState.profiler when there is one;
+with profiler None the only overhead is one attribute check per call.
+"""
+
+import json
+from collections import Counter
+from functools import wraps
+from math import ceil
+from time import perf_counter
+
+
+def timed(phase):
+    def decorate(method):
+        @wraps(method)
+        def timedMethod(self, *args, **kwargs):
+            profiler = self.profiler
+            if profiler is None:
+                return method(self, *args, **kwargs)
+            start = perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                profiler.record(phase, perf_counter() - start)
+        return timedMethod
+    return decorate
+
+
+def percentile(sortedSamples, fraction):
+    """ Nearest-rank percentile of an already sorted list. """
+    if not sortedSamples:
+        return 0.0
+    rank = max(ceil(fraction * len(sortedSamples)) - 1, 0)
+    return sortedSamples[min(rank, len(sortedSamples) - 1)]
+
+
+class Profiler(object):
+    def __init__(self):
+        self.samples = {}        # phase -> seconds for every call
+        self.counters = Counter()
+        self.turns = []          # one dict per turn played, see endTurn()
+        self.turnSeconds = {}    # phase -> seconds spent so far in the current turn
+
+    def record(self, phase, seconds):
+        self.samples.setdefault(phase, []).append(seconds)
+        self.turnSeconds[phase] = self.turnSeconds.get(phase, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def startTurn(self):
+        """ Drop what was recorded since the last turn (game setup, say) from the next turn. It stays in the samples. """
+        self.turnSeconds = {}
+
+    def endTurn(self, **fields):
+        """ Close off a turn: fields (answer, guess, candidate counts...) plus the time per phase it took. """
+        fields["seconds"] = self.turnSeconds
+        self.turns.append(fields)
+        self.turnSeconds = {}
+
+    def merge(self, data):
+        """ Fold in another profiler's data() (e.g. from a worker process). """
+        for phase, samples in data["samples"].items():
+            self.samples.setdefault(phase, []).extend(samples)
+        self.counters.update(data["counters"])
+        self.turns.extend(data["turns"])
+
+    def data(self):
+        return {"samples": self.samples, "counters": dict(self.counters), "turns": self.turns}
+
+    def summary(self):
+        """ {phase: {calls, total, p50, p90, p99, max}} with times in seconds. """
+        phases = {}
+        for phase, samples in self.samples.items():
+            ordered = sorted(samples)
+            phases[phase] = {
+                "calls": len(ordered),
+                "total": sum(ordered),
+                "p50": percentile(ordered, .5),
+                "p90": percentile(ordered, .9),
+                "p99": percentile(ordered, .99),
+                "max": ordered[-1],
+            }
+        return phases
+
+    def jsonLines(self):
+        """ One JSON object per turn, then one per phase, then the counters. """
+        for turn in self.turns:
+            yield json.dumps(dict(turn, type="turn"))
+        for phase, stats in sorted(self.summary().items()):
+            yield json.dumps(dict(stats, type="phase", phase=phase))
+        yield json.dumps({"type": "counters", "counters": dict(self.counters)})
+
+    def table(self):
+        lines = ["%-24s %8s %10s %10s %10s %10s %10s" % ("phase", "calls", "total s", "p50 ms", "p90 ms", "p99 ms", "max ms")]
+        for phase, stats in sorted(self.summary().items(), key=lambda item: -item[1]["total"]):
+            lines.append("%-24s %8d %10.3f %10.3f %10.3f %10.3f %10.3f" % (
+                phase, stats["calls"], stats["total"],
+                stats["p50"] * 1000, stats["p90"] * 1000, stats["p99"] * 1000, stats["max"] * 1000))
+
+        byTurn = {}
+        for turn in self.turns:
+            byTurn.setdefault(turn["turn"], []).append(turn)
+        if byTurn:
+            lines.append("")
+            lines.append("%-6s %8s %18s %18s" % ("turn", "games", "avg before filter", "avg after filter"))
+            for number, turns in sorted(byTurn.items()):
+                before = sum(turn["candidatesBefore"] for turn in turns) / len(turns)
+                after = sum(turn["candidatesAfter"] for turn in turns) / len(turns)
+                lines.append("%-6d %8d %18.1f %18.1f" % (number, len(turns), before, after))
+
+        if self.counters:
+            lines.append("")
+            lines.extend("%s: %d" % (name, value) for name, value in sorted(self.counters.items()))
+        return "\n".join(lines)
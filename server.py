@@ -0,0 +1,332 @@
+# usage:
+# python server.py serve [--host 127.0.0.1] [--port 8080] [--ttl 600] [--workers N] [--guess-list words.bin] [--answer-list words.bin]
+# python server.py bench [--host 127.0.0.1] [--port 8080] [--games 200] [--concurrency 16] [--hard]
+
+"""
+Solver service: many games at once over a small JSON/HTTP API on asyncio (stdlib only).
+
+    POST   /games              {"hardMode": false, "strategy": "entropy"} -> {"id", "guess", "candidates", "turn"}
+    POST   /games/<id>/result  {"result": "bbygb"} -> {"guess" (null once solved), "done", "candidates", "turn"}
+    GET    /games/<id>         current state of a game
+    DELETE /games/<id>
+    GET    /stats              sessions, requests served, cache hit rate
+
+Every session shares the word lists, pattern table, opening books and transposition cache.
+Guesses are computed on a thread pool so a slow turn never blocks the event loop.
+Sessions nobody has touched for --ttl seconds are dropped.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from patterns import colorsFromPattern, computePattern, loadTable, patternFromColors
+from profiling import percentile
+from strategies import strategies
+from wordList import checkAnswers, loadWords
+from wordle import GameState, openingBook, transpositions
+
+reasons = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        Exception.__init__(self, message)
+        self.status = status
+
+
+class Session(object):
+    def __init__(self, gameState):
+        self.gameState = gameState
+        self.lock = asyncio.Lock()  # one turn at a time per game
+        self.lastSeen = time.monotonic()
+        self.turn = 0
+        self.lastGuess = None
+
+
+class SolverService(object):
+    def __init__(self, guesses, answers, bookDepth=2, ttl=600, workers=None):
+        checkAnswers(guesses, answers)
+        self.guesses = guesses
+        self.answers = answers
+        self.bookDepth = bookDepth
+        self.ttl = ttl
+        self.patterns = loadTable(guesses, answers)
+        self.executor = ThreadPoolExecutor(workers)
+        self.sessions = {}
+        self.requests = 0
+        # build every book now, not in the middle of someone's first request
+        # (where two first requests on the pool would race to write the same file)
+        self.books = {}
+        for hardMode in (False, True):
+            for strategy in (None,) + tuple(strategies):
+                self.books[hardMode, strategy] = self.book(hardMode, strategy)
+
+    def book(self, hardMode, strategy):
+        if self.bookDepth <= 0:
+            return None
+        return openingBook(hardMode, strategy, self.bookDepth, self.guesses, self.answers)
+
+    def session(self, sessionId):
+        session = self.sessions.get(sessionId)
+        if session is None:
+            raise RequestError(404, "no game %s" % sessionId)
+        session.lastSeen = time.monotonic()
+        return session
+
+    async def nextGuess(self, session):
+        loop = asyncio.get_running_loop()
+        session.lastGuess = await loop.run_in_executor(self.executor, session.gameState.guess)
+        session.turn += 1
+        return self.describe(session)
+
+    def describe(self, session):
+        gameState = session.gameState
+        return {
+            "guess": None if gameState.done else session.lastGuess,
+            "done": gameState.done,
+            "candidates": len(gameState.candidateIds),
+            "turn": session.turn,
+        }
+
+    async def start(self, hardMode=False, strategy=None):
+        if not isinstance(hardMode, bool):
+            raise RequestError(400, "hardMode should be true or false")
+        if strategy is not None and strategy not in strategies:
+            raise RequestError(400, "unknown strategy %s" % strategy)
+        book = self.books[hardMode, strategy]
+        gameState = GameState(self.guesses, None, hardMode, self.patterns, strategy, book, transpositions,
+                              answers=self.answers)
+        session = Session(gameState)
+        sessionId = uuid.uuid4().hex
+        self.sessions[sessionId] = session
+        async with session.lock:
+            state = await self.nextGuess(session)
+        return dict(state, id=sessionId)
+
+    async def result(self, sessionId, colors):
+        session = self.session(sessionId)
+        async with session.lock:
+            gameState = session.gameState
+            if gameState.done:
+                raise RequestError(409, "game is already solved")
+            colors = str(colors).lower().replace(" ", "")
+            if len(colors) != len(session.lastGuess) or any(color not in "gyb" for color in colors):
+                raise RequestError(400, "result should be %d of g, y or b" % len(session.lastGuess))
+
+            # a result nothing fits is most likely a typo, so put the game back the way it was
+            saved = (gameState.constraints.copy(), len(gameState.history), gameState.candidateBits,
+                     gameState.candidateIds, gameState.done)
+            gameState.applyPattern(session.lastGuess, patternFromColors(colors))
+            if gameState.done:
+                return self.describe(session)
+            gameState.filterWords()
+            if not gameState.candidateIds:
+                gameState.constraints, turns, gameState.candidateBits, gameState.candidateIds, gameState.done = saved
+                del gameState.history[turns:]
+                raise RequestError(409, "no words fit those results")
+            return await self.nextGuess(session)
+
+    def expire(self):
+        cutoff = time.monotonic() - self.ttl
+        for sessionId in [key for key, session in self.sessions.items() if session.lastSeen < cutoff]:
+            del self.sessions[sessionId]
+
+    async def expireForever(self):
+        while True:
+            await asyncio.sleep(max(self.ttl / 4.0, 1))
+            self.expire()
+
+    async def route(self, method, path, body):
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        if parts == ["games"] and method == "POST":
+            return 201, await self.start(body.get("hardMode", False), body.get("strategy"))
+        if len(parts) == 3 and parts[0] == "games" and parts[2] == "result" and method == "POST":
+            return 200, await self.result(parts[1], body.get("result", ""))
+        if len(parts) == 2 and parts[0] == "games":
+            if method == "GET":
+                return 200, dict(self.describe(self.session(parts[1])), id=parts[1])
+            if method == "DELETE":
+                self.session(parts[1])
+                del self.sessions[parts[1]]
+                return 200, {"deleted": parts[1]}
+        if parts == ["stats"] and method == "GET":
+            return 200, {"sessions": len(self.sessions), "requests": self.requests, "cache": transpositions.summary()}
+        if parts and parts[0] in ("games", "stats"):
+            raise RequestError(405, "%s not allowed on %s" % (method, path))
+        raise RequestError(404, "nothing at %s" % path)
+
+    async def handleConnection(self, reader, writer):
+        """ Minimal HTTP/1.1: JSON bodies with Content-Length, keep-alive unless the client says otherwise. """
+        try:
+            while True:
+                requestLine = await reader.readline()
+                if not requestLine.strip():
+                    break
+                method, path, version = requestLine.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                raw = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                self.requests += 1
+                try:
+                    body = json.loads(raw) if raw else {}
+                    if not isinstance(body, dict):
+                        raise RequestError(400, "body should be a JSON object")
+                    status, payload = await self.route(method, path, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except ValueError as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": repr(e)}
+
+                keepAlive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                data = json.dumps(payload).encode()
+                writer.write(("HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n%s\r\n" % (
+                    status, reasons.get(status, ""), len(data), "" if keepAlive else "Connection: close\r\n")).encode())
+                writer.write(data)
+                await writer.drain()
+                if not keepAlive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(service.handleConnection, host, port)
+    expiry = asyncio.ensure_future(service.expireForever())
+    print("serving %d words on http://%s:%d" % (len(service.answers), host, port))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        expiry.cancel()
+        service.executor.shutdown(wait=False)
+
+
+class Client(object):
+    """ One keep-alive connection to the service. """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b""
+        self.writer.write(("%s %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n" % (
+            method, path, self.host, len(data))).encode() + data)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def bench(host, port, games, concurrency, hardMode=False, seed=0, answers=None):
+    """
+    Play games against a running server from `concurrency` connections at once, scoring each guess
+    locally against a random answer, and report throughput and request latency.
+    """
+    answers = loadWords() if answers is None else answers
+    rng = random.Random(seed)
+    toPlay = [answers[rng.randrange(len(answers))] for i in range(games)]
+    latencies = []
+    attempts = []
+    failures = []
+
+    async def timed(client, method, path, body=None):
+        start = time.perf_counter()
+        status, payload = await client.request(method, path, body)
+        latencies.append(time.perf_counter() - start)
+        return status, payload
+
+    async def player():
+        client = Client(host, port)
+        try:
+            while toPlay:
+                answer = toPlay.pop()
+                status, state = await timed(client, "POST", "/games", {"hardMode": hardMode})
+                sessionId = state.get("id")
+                while status < 300 and not state["done"]:
+                    colors = colorsFromPattern(computePattern(state["guess"], answer), len(answer))
+                    status, state = await timed(client, "POST", "/games/%s/result" % sessionId, {"result": colors})
+                if status >= 300:
+                    failures.append((answer, state.get("error")))
+                    continue
+                attempts.append(state["turn"])
+                await timed(client, "DELETE", "/games/%s" % sessionId)
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[player() for i in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    print("%d games, %d requests in %.2fs with %d connections" % (len(attempts), len(ordered), elapsed, concurrency))
+    print("throughput: %.1f requests/s, %.1f games/s" % (len(ordered) / elapsed, len(attempts) / elapsed))
+    print("latency: p50 %.2fms, p90 %.2fms, p99 %.2fms, max %.2fms" % (
+        percentile(ordered, .5) * 1000, percentile(ordered, .9) * 1000, percentile(ordered, .99) * 1000,
+        ordered[-1] * 1000 if ordered else 0))
+    if attempts:
+        print("average attempts: %f" % (sum(attempts) / len(attempts)))
+    for answer, error in failures:
+        print("failed on %s: %s" % (answer, error))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the solver over HTTP, or load-test a running server.")
+    parser.add_argument("command", choices=["serve", "bench"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--guess-list", help="packed or plain text word list to guess from (default: bundled list)")
+    parser.add_argument("--answer-list", help="word list the answers come from (default: the guess list)")
+    parser.add_argument("--book-depth", type=int, default=2, help="serve: turns taken from the opening book, 0 disables it")
+    parser.add_argument("--ttl", type=float, default=600, help="serve: seconds before an idle game is dropped")
+    parser.add_argument("--workers", type=int, default=None, help="serve: threads computing guesses")
+    parser.add_argument("--games", type=int, default=200, help="bench: games to play")
+    parser.add_argument("--concurrency", type=int, default=16, help="bench: connections playing at once")
+    parser.add_argument("--hard", action="store_true", help="bench: play in hard mode")
+    parser.add_argument("--seed", type=int, default=0, help="bench: seed for picking answers")
+    args = parser.parse_args()
+
+    guesses = loadWords(args.guess_list)
+    answers = loadWords(args.answer_list) if args.answer_list else guesses
+    try:
+        checkAnswers(guesses, answers)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(SolverService(guesses, answers, args.book_depth, args.ttl, args.workers), args.host, args.port))
+        else:
+            asyncio.run(bench(args.host, args.port, args.games, args.concurrency, args.hard, args.seed, answers))
+    except KeyboardInterrupt:
+        pass
@@ -1,24 +1,150 @@
-from wordle import run
-from allWords import englishWords
+# usage:
+# python stats.py [--hard] [--strategy entropy|letters] [--book-depth N] [--cache file] [--profile table|json] [--processes N] [--chunk-size N] [--answers words.txt|word,word,...]
+#     [--guess-list words.bin] [--answer-list words.bin]
+
+import argparse
+import os
+from multiprocessing import Pool
+from patterns import loadTable
+from profiling import Profiler
+from strategies import strategies
+from transpositions import cacheFileKey
+from wordList import checkAnswers, loadWords
+from wordle import guessLogic, openingBook, run, transpositions
+
+
+def wordLists(settings):
+    guesses = loadWords(settings["guessList"])
+    answers = loadWords(settings["answerList"]) if settings["answerList"] else guesses
+    checkAnswers(guesses, answers)
+    return guesses, answers
+
+
+def initWorker(settings, cachePath=None):
+    # map the word lists and pattern table and read the opening book (and saved cache) once per worker
+    # rather than once per game
+    guesses, answers = wordLists(settings)
+    loadTable(guesses, answers)
+    if settings["bookDepth"] > 0:
+        openingBook(settings["hardMode"], settings["strategy"], settings["bookDepth"], guesses, answers)
+    if cachePath:
+        transpositions.load(cachePath, cacheFileKey(guesses, answers, guessLogic(strategies)))
+
+
+def evaluateChunk(job):
+    words, settings, profile = job
+    guesses, answers = wordLists(settings)
+    profiler = Profiler() if profile else None
+    results = []
+    for word in words:
+        error = None
+        try:
+            atms = run(word, settings["hardMode"], False, settings["strategy"], settings["bookDepth"], profiler,
+                       guesses, answers)
+        except Exception as e:
+            error = str(e)
+            atms = 7
+        results.append((word, atms, error))
+    # ship what this worker learned (and measured) back so the parent can count it and save it
+    return results, transpositions.drain(), profiler and profiler.data()
+
+
+def evaluate(toTest, hardMode=False, processes=None, chunkSize=25, strategy=None, bookDepth=2, cachePath=None,
+             profiler=None, guessList=None, answerList=None):
+    """
+    Play every answer in toTest and return [(word, attempts, error)] in the same order,
+    however the chunks were spread over the pool.
+        processes: pool size. None uses every core, 1 runs in this process.
+        cachePath: file to warm the transposition cache from, and save it back to afterwards.
+        profiler: optional profiling.Profiler to merge every game's timings into.
+        guessList, answerList: word list paths (see wordList.loadWords). Workers open them by path.
+    """
+    settings = {"hardMode": hardMode, "strategy": strategy, "bookDepth": bookDepth,
+                "guessList": guessList, "answerList": answerList}
+    initWorker(settings, cachePath)  # build the caches up front so workers don't race to write them
+    profile = profiler is not None
+    jobs = [(toTest[i:i + chunkSize], settings, profile) for i in range(0, len(toTest), chunkSize)]
+    results = []
+    if processes == 1:
+        chunks = map(evaluateChunk, jobs)
+        pool = None
+    else:
+        pool = Pool(processes, initializer=initWorker, initargs=(settings, cachePath))
+        chunks = pool.imap(evaluateChunk, jobs)
+
+    for chunk, learned, measured in chunks:
+        results.extend(chunk)
+        transpositions.merge(*learned)
+        if measured:
+            profiler.merge(measured)
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    if cachePath:
+        transpositions.save(cachePath, cacheFileKey(*wordLists(settings), guessLogic(strategies)))
+    return results
+
+
+def readAnswers(spec):
+    """ A file with one word per line, or a comma separated list. """
+    if os.path.exists(spec):
+        with open(spec) as f:
+            return [line.strip().lower() for line in f if line.strip()]
+    return [word.strip().lower() for word in spec.split(',') if word.strip()]
+
+
+def printReport(results):
+    total = 0
+    hist = [list() for i in range(max([10] + [atms + 1 for word, atms, error in results]))]
+    for word, atms, error in results:
+        if error is not None:
+            print("hit error on %s" % word)
+            print(error)
+        total += atms
+        hist[atms].append(word)
+        if (atms > 6):
+            print('%s took %d' % (word, atms))
+
+    for idx, words in enumerate(hist):
+        left = str(idx) + ': ' + str(len(words))
+        hundreds = round(len(words) / 100)
+        print(left + (10 - len(left)) * ' ' + '*' * hundreds)
+
+    if results:
+        print("average: %f" % (total / len(results)))
+    print(transpositions.summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play every answer and report how many attempts the solver needs.")
+    parser.add_argument("--hard", action="store_true", help="play in hard mode")
+    parser.add_argument("--strategy", choices=sorted(strategies), help="how to pick guesses (default: entropy)")
+    parser.add_argument("--book-depth", type=int, default=2, help="turns taken from the opening book, 0 disables it")
+    parser.add_argument("--cache", help="file to load the transposition cache from and save it to, so later runs start warm")
+    parser.add_argument("--profile", choices=["table", "json"], help="time each phase and print a summary table or JSON lines")
+    parser.add_argument("--profile-output", help="write the profile here instead of stdout")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores, 1: no pool)")
+    parser.add_argument("--chunk-size", type=int, default=25, help="answers handed to a worker at a time")
+    parser.add_argument("--answers", help="file with one answer per line, or a comma separated list (default: all answers)")
+    parser.add_argument("--guess-list", help="packed or plain text word list to guess from (default: bundled list)")
+    parser.add_argument("--answer-list", help="word list the answers come from (default: the guess list)")
+    args = parser.parse_args()
 
-hist = [list() for i in range(10)]
-total = 0
-toTest = englishWords
-for word in toTest:
     try:
-        atms = run(word, False, False)
-    except Exception as e:
-        print("hit error on %s" % word)
-        print(e)
-        atms = 7
-    total += atms
-    hist[atms].append(word)
-    if (atms > 6):
-        print('%s took %d'% (word, atms))
-
-for idx, words in enumerate(hist):
-    left = str(idx) + ': ' + str(len(words))
-    hundreds = round(len(words) / 100)
-    print(left + (10 - len(left)) * ' ' + '*' * hundreds)
-
-print("average: %f" % (total / len(toTest)))
\ No newline at end of file
+        answers = wordLists({"guessList": args.guess_list, "answerList": args.answer_list})[1]
+    except ValueError as e:
+        parser.error(str(e))
+    toTest = readAnswers(args.answers) if args.answers else list(answers)
+    if not toTest:
+        parser.error("no answers to play")
+    profiler = Profiler() if args.profile else None
+    printReport(evaluate(toTest, args.hard, args.processes, args.chunk_size, args.strategy, args.book_depth, args.cache,
+                         profiler, args.guess_list, args.answer_list))
+    if profiler:
+        report = profiler.table() if args.profile == "table" else "\n".join(profiler.jsonLines())
+        if args.profile_output:
+            with open(args.profile_output, "w") as f:
+                f.write(report + "\n")
+        else:
+            print(report)
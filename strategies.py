@@ -0,0 +1,96 @@
+"""
+Ways of picking the next guess. A strategy looks at a GameState and returns a word;
+GameState.guess() hands off to whichever one the game was started with.
+"""
+
+from collections import Counter
+from math import log2
+from operator import itemgetter
+
+
+class Strategy(object):
+    name = None
+
+    def choose(self, gameState):
+        raise NotImplementedError
+
+    def cacheKey(self, gameState):
+        """ Hashable key such that games with equal keys get the same guess from choose(). """
+        return gameState.stateKey()
+
+
+class LetterFrequencyStrategy(Strategy):
+    """
+    The original heuristic: score words by how close each of their letters comes to splitting
+    the remaining candidates in half (see GameState.updateLetterUsefulness).
+    """
+    name = "letters"
+
+    def choose(self, gameState):
+        # Easy mode lets us focus on gathering intel instead of using what we already know.
+        # At some point (arbitrarily 3 candidates left), it makes sense to start putting letters
+        # where we know they belong in hopes of getting the answer right.
+        choices = gameState.allWords
+        if len(gameState.candidateIds) < 3 or gameState.hardMode:
+            choices = gameState.candidates
+
+        gameState.updateLetterUsefulness()
+        # max keeps the first of equally useful words, same as a stable sort would
+        return max(choices, key=gameState.wordUsefulness)
+
+
+class EntropyStrategy(Strategy):
+    """
+    Pick the guess with the most expected information: group the candidates by the feedback
+    each guess would get from them, and prefer guesses that leave many small groups.
+    Needs the game to have a PatternTable.
+    """
+    name = "entropy"
+
+    def __init__(self):
+        self.plogp = [0.0]  # plogp[c] = c * log2(c), grown as needed
+
+    def cacheKey(self, gameState):
+        # only the candidate set matters here, however we learned it
+        return (gameState.hardMode, gameState.candidateBits)
+
+    def choose(self, gameState):
+        ids = gameState.candidateIds
+        if len(ids) <= 2:
+            return gameState.answers[ids[0]]
+
+        table = gameState.patterns
+        total = len(ids)
+        plogp = self.plogp
+        if len(plogp) <= total:
+            # built whole and swapped in, since one strategy object serves games on many threads
+            plogp = self.plogp = [0.0] + [c * log2(c) for c in range(1, 2 * total + 1)]
+
+        if total == table.width:
+            pick = None  # every answer is still possible, count whole rows
+        else:
+            pick = itemgetter(*ids)
+        candidateSet = set(ids)
+        isCandidate = table.answerIdOfGuess
+        if gameState.hardMode:
+            choices = [table.guessIds[gameState.answers[i]] for i in ids]
+        else:
+            choices = range(len(table.guesses))
+
+        best = None
+        bestScore = -1.0
+        for guessId in choices:
+            row = table.rowById(guessId)
+            counts = Counter(row if pick is None else pick(row))
+            # entropy of the feedback distribution: log2(n) - sum(c log2 c) / n
+            score = log2(total) - sum(plogp[c] for c in counts.values()) / total
+            if isCandidate[guessId] in candidateSet:
+                # equal information, but this one might also be the answer
+                score += 1.0 / total
+            if score > bestScore:
+                best = guessId
+                bestScore = score
+        return table.guesses[best]
+
+
+strategies = {strategy.name: strategy for strategy in (LetterFrequencyStrategy(), EntropyStrategy())}
@@ -0,0 +1,27 @@
+import pytest
+from patterns import HEADER, PatternTable, colorsFromPattern, computePattern, patternFromColors
+
+
+@pytest.mark.parametrize("guess, answer, colors", [
+    ("speed", "abide", "bbyby"),  # only one e to find, so the second e is grey
+    ("geese", "eerie", "bgybg"),  # greens are matched before yellows
+    ("eerie", "geese", "ygbbg"),
+    ("abbey", "kebab", "yygyb"),
+    ("llama", "hello", "yybbb"),  # both copies are in the answer, both out of place
+    ("cigar", "cigar", "ggggg"),
+])
+def test_repeated_letters(guess, answer, colors):
+    assert colorsFromPattern(computePattern(guess, answer)) == colors
+    assert patternFromColors(colors) == computePattern(guess, answer)
+
+
+def test_table_with_the_wrong_digest_is_rebuilt(tmp_path):
+    path = str(tmp_path / "patterns.bin")
+    PatternTable(["cigar", "rebut"], path=path).data.close()
+
+    # same shape, other words: only the digest in the header tells the files apart
+    table = PatternTable(["speed", "abide"], path=path)
+    with open(path, "rb") as f:
+        assert HEADER.unpack(f.read(HEADER.size))[1] == table.digest
+    assert colorsFromPattern(table.pattern("speed", "abide")) == "bbyby"
+    assert table.pattern("abide", "abide") == patternFromColors("ggggg")
@@ -0,0 +1,70 @@
+import asyncio
+from patterns import colorsFromPattern, computePattern
+from server import Client, SolverService
+from wordList import loadWords
+
+
+def serveAndPlay(play, ttl=600):
+    """ Run play(client, service) against a SolverService listening on a free localhost port. """
+    async def main():
+        words = loadWords()
+        service = SolverService(words, words, ttl=ttl)
+        server = await asyncio.start_server(service.handleConnection, "127.0.0.1", 0)
+        expiry = asyncio.ensure_future(service.expireForever())
+        client = Client("127.0.0.1", server.sockets[0].getsockname()[1])
+        try:
+            await play(client, service)
+        finally:
+            client.close()
+            expiry.cancel()
+            server.close()
+            await server.wait_closed()
+            service.executor.shutdown()
+    asyncio.run(main())
+
+
+def test_result_that_fits_no_word_leaves_the_game_playable():
+    answer = "cigar"
+
+    async def play(client, service):
+        status, state = await client.request("POST", "/games", {})
+        assert status == 201
+        path = "/games/%s" % state["id"]
+        gameState = service.sessions[state["id"]].gameState
+        fits = set(computePattern(state["guess"], gameState.answers[i]) for i in gameState.candidateIds)
+        impossible = next(code for code in range(3 ** len(answer)) if code not in fits)
+
+        status, rejected = await client.request("POST", path + "/result", {"result": colorsFromPattern(impossible)})
+        assert status == 409
+        status, unchanged = await client.request("GET", path)
+        assert status == 200 and unchanged == state
+
+        while not state["done"]:
+            colors = colorsFromPattern(computePattern(state["guess"], answer))
+            status, state = await client.request("POST", path + "/result", {"result": colors})
+            assert status == 200, state
+        assert state["turn"] <= 6
+        assert gameState.history[-1][0] == answer
+
+    serveAndPlay(play)
+
+
+def test_hard_mode_must_be_a_json_boolean():
+    async def play(client, service):
+        status, state = await client.request("POST", "/games", {"hardMode": "false"})
+        assert status == 400, state
+        status, state = await client.request("POST", "/games", {"hardMode": False})
+        assert status == 201, state
+
+    serveAndPlay(play)
+
+
+def test_idle_games_expire():
+    async def play(client, service):
+        status, state = await client.request("POST", "/games", {})
+        assert status == 201
+        await asyncio.sleep(1.5)  # the expiry loop wakes up at least once a second
+        status, state = await client.request("GET", "/games/%s" % state["id"])
+        assert status == 404, state
+
+    serveAndPlay(play, ttl=0.2)
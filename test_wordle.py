@@ -0,0 +1,56 @@
+import pytest
+from patterns import loadTable
+from wordList import loadWords
+from wordle import GameState, letters, run
+
+
+def letterValuesFromScratch(candidates, minLetterCounts):
+    """ GameState.updateLetterUsefulness as it was before the histogram became incremental. """
+    letterHist = {}
+    for letter in letters:
+        letterHist[letter] = 0
+        letterHist[letter * 2] = 0
+        letterHist[letter * 3] = 0
+        for word in candidates:
+            if letter in word:
+                for i in range(word.count(letter)):
+                    toAdd = 1
+                    if minLetterCounts.get(letter):
+                        toAdd = .1
+                    letterHist[letter * (i + 1)] += toAdd
+
+    def score(frequency):
+        return -1 * abs(frequency - .5) + .5
+
+    return {letter: score(val/len(candidates)) for letter,val in letterHist.items()}
+
+
+@pytest.mark.parametrize("hardMode", [False, True])
+def test_incremental_letter_values_match_full_rebuild(hardMode):
+    words = loadWords()
+    patterns = loadTable(words, words)
+    for answer in words[::23]:
+        gameState = GameState(words, answer, hardMode, patterns, "letters")
+        while not gameState.done:
+            gameState.updateLetterUsefulness()
+            expected = letterValuesFromScratch(gameState.candidates, gameState.minLetterCounts)
+            assert gameState.letterValues == expected, (answer, gameState.history)
+            gameState.autoUpdateState(gameState.guess())
+            gameState.filterWords()
+
+
+@pytest.mark.parametrize("hardMode", [False, True])
+def test_answers_can_be_a_subset_of_guesses(tmp_path, hardMode):
+    words = loadWords()
+    path = tmp_path / "answers.txt"
+    path.write_text("\n".join(words[::97]))
+    answers = loadWords(str(path))
+    for answer in answers:
+        assert run(answer, hardMode, False, guesses=words, answers=answers) <= 6, answer
+
+
+def test_answers_outside_the_guess_list_are_rejected(tmp_path):
+    path = tmp_path / "answers.txt"
+    path.write_text("cigar\nqajaq\n")
+    with pytest.raises(ValueError, match="qajaq"):
+        run("cigar", True, False, guesses=loadWords(), answers=loadWords(str(path)))
@@ -0,0 +1,100 @@
+"""
+Transposition cache: games that reach the same knowledge pick the same next guess, so remember it.
+Keys come from the strategy (see Strategy.cacheKey) and are prefixed with the strategy's name and
+a digest of the word lists, so one cache can be shared by every game in a process whatever mode,
+strategy or word lists they use.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from patterns import listsDigest
+
+
+def cacheFileKey(guesses, answers, logic):
+    """
+    Saved entries are only good for the same word lists and the same code behind the guesses.
+        logic: source of that code for every strategy in the cache (see wordle.guessLogic).
+    """
+    digest = hashlib.sha1(listsDigest(guesses, answers))
+    digest.update(logic.encode())
+    return digest.hexdigest()
+
+
+class TranspositionCache(object):
+    def __init__(self, maxSize=50000):
+        self.maxSize = maxSize
+        self.entries = OrderedDict()  # least recently used first
+        self.fresh = {}               # entries added since the last drain()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # games may share the cache across threads (see server.py)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            guess = self.entries.get(key)
+            if guess is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return guess
+
+    def put(self, key, guess):
+        with self.lock:
+            self.entries[key] = guess
+            self.entries.move_to_end(key)
+            self.fresh[key] = guess
+            while len(self.entries) > self.maxSize:
+                self.entries.popitem(last=False)
+
+    def drain(self):
+        """ Hand back (new entries, hits, misses) since the last drain and reset them, for merging across processes. """
+        drained = (self.fresh, self.hits, self.misses)
+        self.fresh = {}
+        self.hits = 0
+        self.misses = 0
+        return drained
+
+    def merge(self, entries, hits=0, misses=0):
+        for key, guess in entries.items():
+            if key not in self.entries:
+                self.put(key, guess)
+        self.hits += hits
+        self.misses += misses
+
+    def load(self, path, fileKey):
+        """ Warm the cache from disk. Files written for another word list or strategy version are ignored. """
+        try:
+            with open(path, "rb") as f:
+                stored = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+        if stored.get("key") != fileKey:
+            return False
+        for key, guess in stored["entries"]:
+            if key not in self.entries:
+                self.entries[key] = guess
+        while len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+        return True
+
+    def save(self, path, fileKey):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmpPath = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmpPath, "wb") as f:
+            pickle.dump({"key": fileKey, "entries": list(self.entries.items())}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpPath, path)
+        self.fresh = {}
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = 100.0 * self.hits / lookups if lookups else 0.0
+        return "transposition cache: %d hits, %d misses (%.1f%%), %d entries" % (self.hits, self.misses, rate, len(self))
@@ -0,0 +1,132 @@
+# usage:
+# python wordList.py out.bin [words.txt]
+# packs words.txt (one word per line) into out.bin, or allWords.englishWords if no text file is given
+
+"""
+Word lists as packed fixed-width binary files: a 12 byte header (magic, word width, word count)
+followed by every word back to back, width ASCII bytes each. Files are memory-mapped and
+words are only decoded when they're asked for. Iterating decodes the whole list in one go,
+and constraints.WordIndex reads the packed bytes directly (see packedLetters).
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"WLST"
+HEADER = struct.Struct("<4sB3xI")
+
+defaultPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "englishWords.bin")
+
+
+class WordList(object):
+    """ Read-only sequence of the words in a packed file. Ids are positions in the file. """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.width, self.count = HEADER.unpack_from(self.data)
+        if magic != MAGIC or len(self.data) != HEADER.size + self.width * self.count:
+            raise ValueError("%s is not a packed word list" % path)
+        self.ids = None  # word -> id, built on first lookup
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("word id out of range")
+        start = HEADER.size + i * self.width
+        return self.data[start:start + self.width].decode("ascii")
+
+    def __iter__(self):
+        # one decode for the whole list, then slices of it
+        text = self.data[HEADER.size:].decode("ascii")
+        return (text[start:start + self.width] for start in range(0, len(text), self.width))
+
+    def __contains__(self, word):
+        return self.id(word) is not None
+
+    def id(self, word):
+        if self.ids is None:
+            self.ids = {word: i for i, word in enumerate(self)}
+        return self.ids.get(word)
+
+    def index(self, word):
+        i = self.id(word)
+        if i is None:
+            raise ValueError("%s is not in the word list" % word)
+        return i
+
+
+def packedLetters(words):
+    """ Every word back to back as ASCII bytes. Straight from the file for a packed list. """
+    if isinstance(words, WordList):
+        return words.data[HEADER.size:]
+    return "".join(words).encode("ascii")
+
+
+def pack(words, path):
+    width = len(words[0]) if words else 5
+    if any(len(word) != width for word in words):
+        raise ValueError("every word in a packed list must be %d letters" % width)
+    tmpPath = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmpPath, "wb") as f:
+        f.write(HEADER.pack(MAGIC, width, len(words)))
+        f.write(packedLetters(words))
+    os.replace(tmpPath, path)
+
+
+def readText(path):
+    with open(path) as f:
+        return [line.strip().lower() for line in f if line.strip()]
+
+
+_lists = {}
+
+
+def loadWords(path=None):
+    """
+    A packed list (mapped, shared by everything in this process that asks for the same path),
+    or a plain text file with one word per line. Defaults to the bundled English list.
+    """
+    path = os.path.abspath(path or defaultPath)
+    words = _lists.get(path)
+    if words is None:
+        with open(path, "rb") as f:
+            packed = f.read(len(MAGIC)) == MAGIC
+        words = _lists[path] = WordList(path) if packed else readText(path)
+    return words
+
+
+_checked = {}
+
+
+def checkAnswers(guesses, answers):
+    """
+    Every answer has to be a word we may guess: strategies play candidates and the pattern table
+    only has rows for guesses. Raises ValueError otherwise. Checked once per process per pair of lists.
+    """
+    key = (id(guesses), id(answers))
+    if answers is guesses or key in _checked:
+        return
+    allowed = set(guesses)
+    missing = [word for word in answers if word not in allowed]
+    if missing:
+        raise ValueError("%d answers aren't in the guess list (%s)" % (len(missing), ", ".join(missing[:5])))
+    _checked[key] = (guesses, answers)  # holding the lists keeps their ids from being reused
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        toPack = readText(sys.argv[2])
+    else:
+        from allWords import englishWords
+        toPack = englishWords
+    pack(toPack, sys.argv[1])
@@ -1,46 +1,116 @@
 # usage:
-# python wordle.py hardMode knownAnswer
-
-import sys
-from allWords import englishWords
-from functools import cmp_to_key
+# python wordle.py hardMode knownAnswer [--guess-list words.bin] [--answer-list words.bin]
+
+import argparse
+import inspect
+from array import array
+from constraints import Constraints, countBits, idsFromBits, letterFromId, letterId, loadIndex
+from openingBook import loadBook
+from patterns import GREEN, computePattern, listsDigest, loadTable, patternFromColors
+from profiling import timed
+from strategies import strategies
+from time import perf_counter
+from transpositions import TranspositionCache
+from wordList import checkAnswers, loadWords
 
 letters = "abcdefghijklmnopqrstuvwxyz"
 
+# tenths[n] is .1 added up n times, which isn't quite n * .1 in floating point.
+# Kept so the histogram scores exactly what adding .1 per word used to.
+tenths = [0]
+
+
+def repeatedTenths(n):
+    global tenths
+    if len(tenths) <= n:
+        # grow a copy and swap it in, so games running on other threads never see a half-built table
+        grown = list(tenths)
+        while len(grown) <= n:
+            grown.append(grown[-1] + .1)
+        tenths = grown
+    return tenths[n]
+
 
 class GameState(object):
-    def __init__(self, allWords, answer=None, hardMode=False):
+    def __init__(self, allWords, answer=None, hardMode=False, patterns=None, strategy=None, book=None, cache=None,
+                 profiler=None, answers=None):
         self.done = False
-        self.knownCorrect = ['*'] * 5     # green letters
-        self.wrongLocations = [list() for i in range(5)]  # lists of letters not at that list's index
-        self.minLetterCounts = dict()     # yellow letters
-        self.exactLetterCounts = dict()   # accumulation of greys
+        self.profiler = profiler          # optional profiling.Profiler to time methods into
         self.answer = answer              # optional known answer
-        self.allWords = allWords
-        self.candidates = self.allWords.copy()
+        self.allWords = allWords          # words we may guess
+        self.answers = allWords if answers is None else answers  # words that may be the solution
+        self.wordsDigest = listsDigest(allWords, self.answers)  # tells these lists apart in a shared cache
+        self.index = loadIndex(self.answers)  # answers encoded as letter ids and word bitsets
+        self.constraints = Constraints(self.index.length)
+        self.patterns = patterns          # optional PatternTable, allWords x answers
+        self.history = []                 # (guess, pattern code) for every turn so far
+        self.candidateBits = self.index.all
+        self.candidateIds = range(len(self.answers))  # ids into answers, not a copy of the words
+        self.letterHistogram = list(self.index.letterHistogram)
+        self.histogramBits = self.index.all  # the candidates letterHistogram currently counts
         self.lastUpdateCount = -1
         self.updateLetterUsefulness()
         self.hardMode = hardMode
-
+        if strategy is None:
+            strategy = "entropy" if patterns is not None else "letters"
+        self.strategy = strategies[strategy]
+        self.book = book                  # optional OpeningBook for the first turns
+        self.cache = cache                # optional TranspositionCache shared between games
+
+    @property
+    def candidates(self):
+        """ remaining possible answers, decoded from candidateIds """
+        return [self.answers[i] for i in self.candidateIds]
+
+    @property
+    def knownCorrect(self):
+        """ green letters """
+        return [letterFromId(l) if l >= 0 else '*' for l in self.constraints.greens]
+
+    @property
+    def wrongLocations(self):
+        """ lists of letters not at that list's index """
+        return [[letterFromId(l) for l in range(26) if (mask >> l) & 1] for mask in self.constraints.wrong]
+
+    @property
+    def minLetterCounts(self):
+        """ yellow (and green) letters """
+        return {letterFromId(l): count for l, count in enumerate(self.constraints.minCounts) if count > 0}
+
+    @property
+    def exactLetterCounts(self):
+        """ accumulation of greys """
+        length = self.constraints.length
+        return {letterFromId(l): count for l, count in enumerate(self.constraints.maxCounts) if count < length}
+
+    @timed("guess")
     def guess(self):
         """
         Easy mode lets us focus on gathering intel instead of using what we already know.
-        At some point (arbitrarily 5 candidates left), it makes sense to start putting letters
-        where we know they belong in hopes of getting the answer right.
         Hard mode requires us to use words that match, and forego some opportunities for learning.
+        How the intel is weighed is up to the strategy (see strategies.py).
+        The first turns come straight from the opening book when there is one,
+        and positions another game has already been through come from the cache.
         """
+        if self.book is not None:
+            bookGuess = self.book.lookup(self.history)
+            if bookGuess is not None:
+                self.profiler and self.profiler.count("bookGuesses")
+                return bookGuess
+        if self.cache is None:
+            return self.strategy.choose(self)
+
+        key = (self.strategy.name, self.wordsDigest, self.strategy.cacheKey(self))
+        guess = self.cache.get(key)
+        if guess is None:
+            self.profiler and self.profiler.count("cacheMisses")
+            guess = self.strategy.choose(self)
+            self.cache.put(key, guess)
+        else:
+            self.profiler and self.profiler.count("cacheHits")
+        return guess
 
-        choices = self.allWords
-        if len(self.candidates) < 3 or self.hardMode:
-            choices =  self.candidates
-
-        self.updateLetterUsefulness()
-        mostUseful = sorted(choices, key=cmp_to_key(lambda a, b: self.sortCandidates(a, b)))
-        return mostUseful[0]
-
-    def sortCandidates(self, word1, word2):
-        return self.wordUsefulness(word2) - self.wordUsefulness(word1)
-
+    @timed("updateLetterUsefulness")
     def updateLetterUsefulness(self):
         """
         computes the histogram of letters in the remaining words
@@ -48,34 +118,47 @@ class GameState(object):
         guesses are in 50% of words.
         store dupes as {a: 10, aa: 2} signifying 2 words with double As (not necessarily consecutive).
         """
-        if len(self.candidates) == self.lastUpdateCount:
+        if len(self.candidateIds) == self.lastUpdateCount:
             return
-        letterHist = {}
-        for letter in letters:
-            letterHist[letter] = 0
-            letterHist[letter * 2] = 0
-            letterHist[letter * 3] = 0
-            for word in self.candidates:
-                if letter in word:
-                    for i in range(word.count(letter)):
-                        toAdd = 1
-                        if self.minLetterCounts.get(letter):
-                            toAdd = .1  # still somewhat worthwhile to find where it fits. Difficult to tune this number.
-                        letterHist[letter * (i + 1)] += toAdd
-        
+
+        # Only touch the words filterWords removed since last time (or the survivors, if there are fewer of those)
+        slots = self.index.slots
+        removedBits = self.histogramBits & ~self.candidateBits
+        if countBits(removedBits) > len(self.candidateIds):
+            letterHist = self.letterHistogram = [0] * len(self.letterHistogram)
+            for i in idsFromBits(self.candidateBits):
+                for slot in slots(i):
+                    letterHist[slot] += 1
+        else:
+            letterHist = self.letterHistogram
+            for i in idsFromBits(removedBits):
+                for slot in slots(i):
+                    letterHist[slot] -= 1
+        self.histogramBits = self.candidateBits
+
         def score(frequency):
             return -1 * abs(frequency - .5) + .5
 
-        self.lastUpdateCount = len(self.candidates)
-        self.letterValues = {letter: score(val/len(self.candidates)) for letter,val in letterHist.items()}
+        total = len(self.candidateIds)
+        self.lastUpdateCount = total
+        self.letterValues = {}
+        for l, letter in enumerate(letters):
+            known = self.constraints.minCounts[l]
+            for k in range(3):
+                count = letterHist[l * 3 + k]
+                if known:
+                    count = repeatedTenths(count)  # still somewhat worthwhile to find where it fits. Difficult to tune this number.
+                self.letterValues[letter * (k + 1)] = score(count / total)
 
     def wordUsefulness(self, word):
         # for each letter that we don't have info about, a word gets points relative to how common the letter is in english
-        letters = list(word) 
+        wrong = self.constraints.wrong
+        greens = self.constraints.greens
         score = 0
-        for idx, letter in enumerate(letters):
-            knownWrongLocation = letter in self.wrongLocations[word.find(letter)]
-            knownRightLocation = self.knownCorrect[idx] == letter
+        for idx, letter in enumerate(word):
+            l = letterId(letter)
+            knownWrongLocation = (wrong[word.find(letter)] >> l) & 1
+            knownRightLocation = greens[idx] == l
             if not knownWrongLocation and not knownRightLocation:
                 if idx == word.find(letter):
                     score += self.letterValues[letter]
@@ -98,33 +181,15 @@ class GameState(object):
         else:
             print(str(len(self.candidates)) + " candidates remaining")
 
+    @timed("filterWords")
     def filterWords(self):
-        self.candidates = [word for word in self.candidates if self.wordAllowed(word)]
-
-    def wordAllowed(self, word):
-        """ Determine if a word matches with the info that we know about the Wordle solution """
-
-        # All green letters must be present
-        for idx, letter in enumerate(self.knownCorrect):
-            if letter != "*" and word[idx] != letter:
-                return False
-
-        # All yellow letters must be present (and we might need more than 1)
-        for letter in self.minLetterCounts:
-            if word.count(letter) < self.minLetterCounts[letter]:
-                return False
+        # a few bitset intersections over the index instead of checking every word
+        self.candidateBits = self.constraints.filter(self.index, self.candidateBits)
+        self.candidateIds = array("I", idsFromBits(self.candidateBits))
 
-        # No letters can be in a known wrong index
-        for idx, letterList in enumerate(self.wrongLocations):
-            if word[idx] in letterList:
-                return False
-
-        # If we've seen grey letters, we know exactly the count of that letter (doesn't mean it's 0 though)
-        for letter in self.exactLetterCounts:
-            if word.count(letter) != self.exactLetterCounts[letter]:
-                return False
-
-        return True
+    def stateKey(self):
+        """ Cheap hashable key: games with equal keys know exactly the same things. """
+        return (self.hardMode, self.constraints.key())
 
     def promptForResult(self, guess):
         """
@@ -133,50 +198,57 @@ class GameState(object):
         """
         print("Input result:")
         colors = input().lower().replace(' ', '')
+        self.applyPattern(guess, patternFromColors(colors))
 
-        # make a temp version of this dict based only on the information we're getting here.
-        tempMinLetterCounts = {}
-        numCorrect = 0
-        for idx, color in enumerate(colors):
-            if color == "g":
-                self.knownCorrect[idx] = guess[idx]
-                numCorrect += 1
-            elif color == "y":
-                tempMinLetterCounts.setdefault(guess[idx], 0)
-                tempMinLetterCounts[guess[idx]] += 1
-                self.wrongLocations[idx].append(guess[idx])
-            else:
-                self.exactLetterCounts[guess[idx]] = tempMinLetterCounts.get(guess[idx]) or 0
-
-        if numCorrect == 5:
-            self.done = True
-        for key in tempMinLetterCounts:
-            self.minLetterCounts[key] = max(self.minLetterCounts.get(key) or 0, tempMinLetterCounts[key])
-
+    @timed("autoUpdateState")
     def autoUpdateState(self, guess):
         """ Only used when we already know the answer and we're just demonstrating the program. """
-        tempMinLetterCounts = {}
-        if guess == self.answer:
+        if self.patterns is not None:
+            code = self.patterns.pattern(guess, self.answer)
+        else:
+            code = computePattern(guess, self.answer)
+        self.applyPattern(guess, code)
+
+    @timed("applyPattern")
+    def applyPattern(self, guess, code):
+        """ Fold one turn of feedback (see patterns.py for the encoding) into what we know. """
+        self.history.append((guess, code))
+        colors = []
+        for idx in range(len(guess)):
+            colors.append(code % 3)
+            code //= 3
+
+        self.constraints.update(guess, colors)
+        if all(color == GREEN for color in colors):
             self.done = True
-        for idx, letter in enumerate(guess):
-            if self.answer[idx] == letter:
-                self.knownCorrect[idx] = letter
-
-        tempAnswer = self.answer
-        for idx, letter in enumerate(guess):
-            if tempAnswer.find(letter) >= 0:
-                tempAnswer = tempAnswer.replace(letter, '', 1)
-                tempMinLetterCounts.setdefault(guess[idx], 0)
-                tempMinLetterCounts[guess[idx]] += 1
-                if self.answer[idx] != letter:
-                    self.wrongLocations[idx].append(letter)
-            else:
-                self.exactLetterCounts[letter] = tempMinLetterCounts.get(letter) or 0
-
-        for key in tempMinLetterCounts:
-            self.minLetterCounts[key] = max(self.minLetterCounts.get(key) or 0, tempMinLetterCounts[key])
-
-def run(answer, hardMode, printStats=True):
+
+
+# shared by every game run() plays in this process
+transpositions = TranspositionCache()
+
+
+def guessLogic(strategyNames):
+    """
+    Source of everything these strategies' guesses depend on: the strategy classes, the letter scoring
+    in GameState, the constraints and the feedback rules. Saved opening books and transposition caches
+    are keyed by it, so changing any of these throws them away.
+    """
+    logic = [type(strategies[name]) for name in sorted(strategyNames)]
+    logic += [GameState.updateLetterUsefulness, GameState.wordUsefulness, repeatedTenths, Constraints, computePattern]
+    return "".join(inspect.getsource(part) for part in logic)
+
+
+def openingBook(hardMode, strategy=None, depth=2, guesses=None, answers=None):
+    """ The cached opening book for this mode, strategy and word lists, built on first use. """
+    guesses = loadWords() if guesses is None else guesses
+    answers = guesses if answers is None else answers
+    patterns = loadTable(guesses, answers)  # also keeps both lists alive, so their ids stay unique
+    memoKey = (id(guesses), id(answers), hardMode, strategy, depth)
+    return loadBook(lambda: GameState(guesses, None, hardMode, patterns, strategy, answers=answers), guessLogic, depth,
+                    memoKey)
+
+
+def run(answer, hardMode, printStats=True, strategy=None, bookDepth=2, profiler=None, guesses=None, answers=None):
     """
         answer:
             if provided the game guesses runs automatically by self-evaluating
@@ -184,13 +256,33 @@ def run(answer, hardMode, printStats=True):
         hardMode:
             if True, the bot is required to use information it has learned
             if False, the bot can optimize for gathering information over using known-correct letters
+        strategy:
+            name of a strategy in strategies.py. Defaults to "entropy".
+        bookDepth:
+            how many turns to take from the opening book (built and cached on first use). 0 disables it.
+        profiler:
+            optional profiling.Profiler. Gets phase timings and one record per turn.
+        guesses, answers:
+            word lists (see wordList.loadWords) to guess from and to expect the answer in.
+            Default to the bundled English list; answers defaults to guesses.
     """
-    gameState = GameState(englishWords, answer, hardMode)
+    setupStart = perf_counter()
+    guesses = loadWords() if guesses is None else guesses
+    answers = guesses if answers is None else answers
+    checkAnswers(guesses, answers)
+    patterns = loadTable(guesses, answers)
+    book = openingBook(hardMode, strategy, bookDepth, guesses, answers) if bookDepth > 0 else None
+    gameState = GameState(guesses, answer, hardMode, patterns, strategy, book, transpositions, profiler, answers)
+    # word lists, table and book lookups plus the new GameState: per game overhead outside any turn
+    if profiler:
+        profiler.record("setup", perf_counter() - setupStart)
+        profiler.startTurn()
     attempts = 0
 
     while attempts < 20:
         printStats and print("\n\n")
         attempts += 1
+        candidatesBefore = len(gameState.candidateIds)
         guess = gameState.guess()
         printStats and print(str(attempts) + ": " + guess.upper())
 
@@ -200,22 +292,33 @@ def run(answer, hardMode, printStats=True):
             gameState.promptForResult(guess)
 
         if gameState.done:
+            profiler and profiler.endTurn(answer=answer, turn=attempts, guess=guess,
+                                          candidatesBefore=candidatesBefore, candidatesAfter=1)
             printStats and print("\nDone!\n")
             break
 
         gameState.filterWords()
+        profiler and profiler.endTurn(answer=answer, turn=attempts, guess=guess,
+                                      candidatesBefore=candidatesBefore, candidatesAfter=len(gameState.candidateIds))
         printStats and gameState.printState()
     return attempts
 
 
 
 if __name__ == "__main__":
-    answer = None
-    hardMode = False
-    if (len(sys.argv) > 1):
-        hardMode = sys.argv[1].lower() == "hard"
-    if (len(sys.argv) > 2):
-        answer = sys.argv[2]
-    else:
+    parser = argparse.ArgumentParser(description="Solve a Wordle, either interactively or against a known answer.")
+    parser.add_argument("hardMode", nargs="?", default="easy", help='"hard" for hard mode')
+    parser.add_argument("knownAnswer", nargs="?", help="play against this answer instead of asking for results")
+    parser.add_argument("--guess-list", help="packed or plain text word list to guess from (default: bundled list)")
+    parser.add_argument("--answer-list", help="word list the answer comes from (default: the guess list)")
+    args = parser.parse_args()
+
+    guesses = loadWords(args.guess_list)
+    answers = loadWords(args.answer_list) if args.answer_list else guesses
+    try:
+        checkAnswers(guesses, answers)
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.knownAnswer:
         print("You'll have to enter the results from the wordle app. Use G, B, and Y.")
-    run(answer, hardMode)
\ No newline at end of file
+    run(args.knownAnswer, args.hardMode.lower() == "hard", guesses=guesses, answers=answers)